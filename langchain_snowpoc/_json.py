@@ -0,0 +1,36 @@
+"""JSON helpers that use orjson when it is available.
+
+orjson rejects some values `json` accepts, such as integers beyond 64 bits,
+so serialization falls back to `json` on a TypeError.
+"""
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize ``obj`` to UTF-8 encoded JSON."""
+        try:
+            return orjson.dumps(obj, option=_OPTIONS)
+        except TypeError:
+            return json.dumps(obj).encode("utf-8")
+
+    def dumps(obj: Any) -> str:
+        """Serialize ``obj`` to a JSON string."""
+        try:
+            return orjson.dumps(obj, option=_OPTIONS).decode("utf-8")
+        except TypeError:
+            return json.dumps(obj)
+
+    loads: Callable[[Any], Any] = orjson.loads
+except ImportError:
+    dumps = json.dumps
+    loads = json.loads
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize ``obj`` to UTF-8 encoded JSON."""
+        return json.dumps(obj).encode("utf-8")
@@ -0,0 +1,134 @@
+"""In-memory caches used to skip repeated calls to Snowflake."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, List, Optional, Sequence, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """A thread-safe, size-bounded mapping evicting the least recently used key.
+
+    Example:
+        .. code-block:: python
+
+            from langchain_snowpoc.cache import LRUCache
+
+            cache = LRUCache(maxsize=2)
+            cache.set("a", 1)
+            cache.get("a")  # 1
+            cache.get("b")  # None
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries to keep, 0 disables the cache
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Return the value for `key`, or `default` when it is not cached."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Store `value` under `key`, evicting the oldest entries if needed."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SemanticCache(Generic[V]):
+    """Serve values stored for embeddings close to a query embedding.
+
+    Embeddings are kept normalized in a preallocated `numpy` matrix, so a
+    lookup is a single matrix-vector product. When the cache is full, the
+    oldest entry is overwritten.
+
+    Requires `numpy`, an ImportError is raised on construction without it.
+    """
+
+    def __init__(self, threshold: float = 0.97, maxsize: int = 128) -> None:
+        """Initialize the cache.
+
+        Args:
+            threshold: Minimal cosine similarity for a lookup to be a hit
+            maxsize: Maximum number of entries to keep
+        """
+        import numpy as np
+
+        self._np = np
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._matrix: Any = None
+        self._values: List[V] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _normalize(self, embedding: Sequence[float]) -> Any:
+        vec = self._np.asarray(embedding, dtype=self._np.float32)
+        norm = self._np.linalg.norm(vec)
+        return vec / norm if norm else None
+
+    def get(self, embedding: Sequence[float]) -> Optional[V]:
+        """Return the value of the closest entry above the threshold, if any."""
+        vec = self._normalize(embedding)
+        with self._lock:
+            if vec is None or not self._values:
+                return None
+            similarities = self._matrix[: len(self._values)] @ vec
+            best = int(similarities.argmax())
+            if similarities[best] >= self.threshold:
+                return self._values[best]
+        return None
+
+    def set(self, embedding: Sequence[float], value: V) -> None:
+        """Store `value` for `embedding`."""
+        vec = self._normalize(embedding)
+        if vec is None or self.maxsize <= 0:
+            return
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = self._np.empty(
+                    (self.maxsize, vec.shape[0]), dtype=self._np.float32
+                )
+            idx = self._next
+            if idx < len(self._values):
+                self._values[idx] = value
+            else:
+                self._values.append(value)
+            self._matrix[idx] = vec
+            self._next = (idx + 1) % self.maxsize
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._values = []
+            self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
@@ -2,27 +2,91 @@
 
 from __future__ import annotations
 
-import json
+import functools
+import gzip
 import logging
 import re
+import threading
 import uuid
-from typing import List, Sequence
+import weakref
+from io import BytesIO
+from typing import Dict, Iterator, List, Optional, Sequence, Union
 
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
 from snowflake.snowpark.session import Session
 
+from langchain_snowpoc import _json
+from langchain_snowpoc.session import get_session
+
+BULK_INSERT_THRESHOLD = 100
+_BULK_STAGE = "@~/chat_history_tmp"
+_TABLE_NAME_RE = re.compile(r"^\w+\Z")
+
 logger = logging.getLogger(__name__)
 
+# whether a table stores session ids as strings, looked up once per session
+_legacy_tables: "weakref.WeakKeyDictionary[Session, Dict[str, bool]]" = (
+    weakref.WeakKeyDictionary()
+)
+_legacy_lock = threading.Lock()
+
+
+def _has_string_session_id(session: Session, table_name: str) -> bool:
+    """Tell whether `table_name` stores session ids as CHAR(36) strings.
+
+    Tables created before session ids were stored as BINARY(16) keep the
+    string form. A missing table is reported as binary, the current schema.
+    """
+    with _legacy_lock:
+        tables = _legacy_tables.setdefault(session, {})
+        if table_name in tables:
+            return tables[table_name]
+    rows = session.sql(
+        """SELECT DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = CURRENT_SCHEMA()
+            AND TABLE_NAME = ?
+            AND COLUMN_NAME = 'SESSION_ID'
+        """,
+        params=[table_name.upper()],
+    ).collect()
+    legacy = bool(rows) and rows[0].DATA_TYPE != "BINARY"
+    with _legacy_lock:
+        tables[table_name] = legacy
+    return legacy
+
+
+def _forget_session_id_type(session: Session, table_name: str) -> None:
+    """Drop the cached column type for a table that was created or dropped."""
+    with _legacy_lock:
+        _legacy_tables.get(session, {}).pop(table_name, None)
+
 
-def _create_table_and_index(table_name: str) -> List[str]:
+def _create_table_and_index(table_name: str, storage: str = "hybrid") -> List[str]:
     """Make a SQL query to create a table."""
+    if storage == "standard":
+        return [
+            f"""
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                id NUMBER AUTOINCREMENT START 1 INCREMENT 1,
+                session_id BINARY(16) NOT NULL,
+                message VARIANT NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP()
+            )
+            CLUSTER BY (session_id);
+            """,
+        ]
+    if storage != "hybrid":
+        raise ValueError(
+            f"Invalid storage {storage!r}. Valid options are: hybrid, standard"
+        )
+
     index_name = f"idx_{table_name}_session_id"
     statements = [
         f"""
         CREATE HYBRID TABLE IF NOT EXISTS {table_name} (
             id NUMBER PRIMARY KEY AUTOINCREMENT START 1 INCREMENT 1,
-            session_id CHAR(36) NOT NULL,
+            session_id BINARY(16) NOT NULL,
             message VARIANT NOT NULL,
             created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP()
         );
@@ -38,14 +102,22 @@ def _get_messages_query(table_name: str) -> str:
     """Make a SQL query to get messages for a given session."""
     return f"""SELECT message
         FROM {table_name}
-        WHERE session_id = '%(session_id)s'
-        ORDER BY created_at ASC;
+        WHERE session_id = ?
+        ORDER BY created_at ASC, id ASC;
+        """
+
+
+def _get_messages_array_query(table_name: str) -> str:
+    """Make a SQL query to get messages for a given session as one array."""
+    return f"""SELECT ARRAY_AGG(message) WITHIN GROUP (ORDER BY created_at ASC, id ASC)
+        FROM {table_name}
+        WHERE session_id = ?;
         """
 
 
 def _delete_by_session_id_query(table_name: str) -> str:
     """Make a SQL query to delete messages for a given session."""
-    return f"""DELETE FROM {table_name} WHERE session_id = '%(session_id)s';"""
+    return f"""DELETE FROM {table_name} WHERE session_id = ?;"""
 
 
 def _delete_table_query(table_name: str) -> str:
@@ -53,11 +125,55 @@ def _delete_table_query(table_name: str) -> str:
     return f"""DROP TABLE IF EXISTS {table_name};"""
 
 
-def _insert_message_query(table_name: str) -> str:
-    """Make a SQL query to insert a message."""
+@functools.lru_cache(maxsize=32)
+def _insert_message_query(table_name: str, n: int) -> str:
+    """Make a SQL query to insert `n` messages in a single statement.
+
+    Rows are bound as ``(position, session_id, message)`` triples. All rows of
+    a statement share CURRENT_TIMESTAMP(), and AUTOINCREMENT values are not
+    guaranteed to follow the VALUES order, so each row's created_at is offset
+    by its position in nanoseconds to keep the messages ordered. The text only
+    depends on the table and the batch size, so it is memoized: repeated
+    batches of the same size reuse one string, and Snowflake sees identical
+    statement text.
+    """
+    values = ", ".join(["(?, ?, ?)"] * n)
+    return f"""
+        INSERT INTO {table_name} (session_id, message, created_at)
+        SELECT
+            column2 as session_id,
+            PARSE_JSON(column3) as message,
+            DATEADD(ns, column1, CURRENT_TIMESTAMP()) as created_at
+        FROM VALUES {values}
+        """
+
+
+def _copy_messages_query(
+    table_name: str, file_name: str, string_session_id: bool = False
+) -> str:
+    """Make a SQL query to load messages from a staged NDJSON file.
+
+    As with `_insert_message_query`, created_at is offset by the position of
+    each message in the file. The file holds the session id as hex, or as
+    given by the caller for tables with a `string_session_id`.
+    """
+    session_id = (
+        "$1:session_id::VARCHAR"
+        if string_session_id
+        else "TO_BINARY($1:session_id::VARCHAR, 'HEX')"
+    )
     return f"""
-        INSERT INTO {table_name} (session_id, message)
-        SELECT '%s' as session_id, PARSE_JSON($$%s$$) as message
+        COPY INTO {table_name} (session_id, message, created_at)
+        FROM (
+            SELECT
+                {session_id},
+                $1:message,
+                DATEADD(ns, $1:position::NUMBER, CURRENT_TIMESTAMP())
+            FROM {_BULK_STAGE}/
+        )
+        FILES = ('{file_name}')
+        FILE_FORMAT = (TYPE = JSON COMPRESSION = GZIP)
+        PURGE = TRUE
         """
 
 
@@ -68,7 +184,9 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
         session_id: str,
         /,
         *,
-        session: Session,
+        session: Optional[Session] = None,
+        connection_name: Optional[str] = None,
+        bulk_insert_threshold: int = BULK_INSERT_THRESHOLD,
     ) -> None:
         """Client for persisting chat message history in Snowflake.
 
@@ -78,7 +196,11 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
         The schema has the following columns:
 
         - id: A serial primary key.
-        - session_id: The session ID for the chat message history.
+        - session_id: The session ID for the chat message history, stored as
+          the 16 raw bytes of the UUID. Tables created with a CHAR(36)
+          session_id by earlier versions keep working: the column type is
+          looked up once per session and table, and such tables are queried
+          with the session id exactly as given.
         - message: The JSON message content.
         - created_at: The timestamp of when the message was created.
 
@@ -89,11 +211,21 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
         A session_id can be used to separate different chat histories in the same table,
         the session_id should be provided when initializing the client.
 
-        This chat history client takes in a psycopg connection object
-        and uses it to interact with the database.
+        This chat history client takes in a Snowpark session, or the name of a
+        connection, and uses it to interact with the database.
 
         This design allows to reuse the underlying connection object across
         multiple instantiations of this class, making instantiation fast.
+        Sessions created from a connection name are shared by every client
+        that uses the same name, see `langchain_snowpoc.session.get_session`.
+
+        The table is a hybrid table with an index on session_id by default.
+        Hybrid tables pay a per-row transactional cost on every write, which
+        adds up for append-heavy chat workloads. Pass `storage="standard"` to
+        `create_tables` to get a standard table clustered by session_id
+        instead: inserts are cheaper, and session lookups are served by
+        micro-partition pruning, at the cost of slower single-row point reads.
+        The client works the same way with both tables.
 
         This chat history client is designed for prototyping applications that
         involve chat and are based on Snowflake.
@@ -112,6 +244,10 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
             session_id: The session ID to use for the chat message history
             table_name: The name of the database table to use
             session: An existing Snowflake session instance
+            connection_name: Name of a connection to get a shared session for,
+                used when `session` is not provided
+            bulk_insert_threshold: Batches of more messages than this are
+                loaded with PUT + COPY INTO instead of a multi-row INSERT
 
         Usage:
             - Use the create_tables method to set up the table schema in the database.
@@ -138,6 +274,10 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
             # Create the table schema (only needs to be done once)
             table_name = "chat_history"
             # SnowflakeChatMessageHistory.create_tables(session, table_name)
+            # or, for write-heavy workloads:
+            # SnowflakeChatMessageHistory.create_tables(
+            #     session, table_name, storage="standard"
+            # )
 
             session_id = str(uuid.uuid4())
 
@@ -162,8 +302,9 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
             dt = (
                 session
                 .sql(
-                f"select message from {table_name} where session_id='{session_id}' "
-                    "order by created_at ASC"
+                    f"select message from {table_name} where session_id = ? "
+                    "order by created_at ASC",
+                    params=[uuid.UUID(session_id).bytes],
                 )
                 .collect()
             )
@@ -172,35 +313,65 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
 
         """
 
+        if session is None:
+            if connection_name is None:
+                raise ValueError(
+                    "Please provide either a session or a connection_name."
+                )
+            session = get_session(connection_name)
         self._session = session
 
         try:
-            uuid.UUID(session_id)
+            session_uuid = uuid.UUID(session_id)
         except ValueError:
             raise ValueError(
                 f"Invalid session id. Session id must be a valid UUID. Got {session_id}"
             )
 
         self._session_id = session_id
+        self._session_uuid = session_uuid
 
-        if not re.match(r"^\w+$", table_name):
+        if not _TABLE_NAME_RE.match(table_name):
             raise ValueError(
                 "Invalid table name. Table name must contain only alphanumeric "
                 "characters and underscores."
             )
         self._table_name = table_name
+        self._bulk_insert_threshold = bulk_insert_threshold
+        self._string_session_id: Optional[bool] = None
+
+    @property
+    def _session_key(self) -> Union[bytes, str]:
+        """The value bound to the session_id column."""
+        if self._string_session_id is None:
+            self._string_session_id = _has_string_session_id(
+                self._session, self._table_name
+            )
+        if self._string_session_id:
+            return self._session_id
+        return self._session_uuid.bytes
 
     @staticmethod
     def create_tables(
         session: Session,
         table_name: str,
         /,
+        *,
+        storage: str = "hybrid",
     ) -> None:
-        """Create the table schema in the database and create relevant indexes."""
-        queries = _create_table_and_index(table_name)
+        """Create the table schema in the database and create relevant indexes.
+
+        Args:
+            session: The database Session.
+            table_name: The name of the table to create.
+            storage: `hybrid` for a hybrid table with an index on session_id,
+                or `standard` for a standard table clustered by session_id.
+        """
+        queries = _create_table_and_index(table_name, storage)
         logger.info("Creating table %s", table_name)
         for query in queries:
             session.sql(query).collect()
+        _forget_session_id_type(session, table_name)
 
     @staticmethod
     def drop_table(session: Session, table_name: str, /) -> None:
@@ -218,39 +389,92 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
         query = _delete_table_query(table_name)
         logger.info("Dropping table %s", table_name)
         session.sql(query).collect()
+        _forget_session_id_type(session, table_name)
 
     def add_messages(self, messages: Sequence[BaseMessage]) -> None:
-        """Add messages to the chat message history."""
+        """Add messages to the chat message history.
 
-        values = [
-            (
-                self._session_id,
-                json.dumps(message_to_dict(message)),
-            )
-            for message in messages
-        ]
+        All messages are written with a single multi-row INSERT, so adding
+        a batch costs one round-trip to Snowflake. Batches larger than
+        `bulk_insert_threshold` are staged as a compressed file and loaded
+        with COPY INTO, which avoids building and parsing a huge statement.
+        """
+        if not messages:
+            return
 
-        query = _insert_message_query(self._table_name)
+        if len(messages) > self._bulk_insert_threshold:
+            self._copy_messages(messages)
+            return
 
-        for value in values:
-            _q = query % (
-                value[0],
-                value[1],
+        params = []
+        for i, message in enumerate(messages):
+            params.extend(
+                (i, self._session_key, _json.dumps(message_to_dict(message)))
             )
-            self._session.sql(_q).collect()
 
-    def get_messages(self) -> List[BaseMessage]:
-        """Retrieve messages from the chat message history."""
-        query = _get_messages_query(self._table_name)
-        items = [
-            json.loads(record[0])
-            for record in self._session.sql(
-                query % {"session_id": self._session_id}
+        query = _insert_message_query(self._table_name, len(messages))
+        self._session.sql(query, params=params).collect()
+
+    def _copy_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Load messages through a gzipped NDJSON file on the user stage."""
+        session_key = self._session_key
+        # COPY reads the id as text, hex for the BINARY(16) column
+        session_text = (
+            session_key if isinstance(session_key, str) else session_key.hex()
+        )
+        payload = gzip.compress(
+            b"\n".join(
+                _json.dumps_bytes(
+                    {
+                        "position": i,
+                        "session_id": session_text,
+                        "message": message_to_dict(m),
+                    }
+                )
+                for i, m in enumerate(messages)
+            )
+        )
+        file_name = f"{uuid.uuid4()}.json.gz"
+        self._session.file.put_stream(
+            BytesIO(payload),
+            f"{_BULK_STAGE}/{file_name}",
+            auto_compress=False,
+            overwrite=True,
+        )
+        try:
+            self._session.sql(
+                _copy_messages_query(
+                    self._table_name, file_name, self._string_session_id
+                )
             ).collect()
-        ]
+        except Exception:
+            self._session.sql(f"REMOVE {_BULK_STAGE}/{file_name}").collect()
+            raise
 
-        messages = messages_from_dict(items)
-        return messages
+    def _iter_records(self) -> Iterator[dict]:
+        """Stream the stored messages of the session as dictionaries."""
+        query = _get_messages_query(self._table_name)
+        for record in self._session.sql(
+            query, params=[self._session_key]
+        ).to_local_iterator():
+            yield _json.loads(record[0])
+
+    def iter_messages(self) -> Iterator[BaseMessage]:
+        """Yield messages one at a time, without materializing the history."""
+        for item in self._iter_records():
+            yield messages_from_dict([item])[0]
+
+    def get_messages(self) -> List[BaseMessage]:
+        """Retrieve messages from the chat message history.
+
+        Messages are aggregated into a single array server-side, so the whole
+        history arrives as one row and is parsed in one call. A VARIANT value
+        is limited in size, use `iter_messages` for very long histories.
+        """
+        query = _get_messages_array_query(self._table_name)
+        raw = self._session.sql(query, params=[self._session_key]).collect()[0][0]
+        items = _json.loads(raw) if isinstance(raw, str) else raw or []
+        return messages_from_dict(items)
 
     @property
     def messages(self) -> List[BaseMessage]:
@@ -265,4 +489,4 @@ class SnowflakeChatMessageHistory(BaseChatMessageHistory):
             )
 
         query = _delete_by_session_id_query(self._table_name)
-        self._session.sql(query, {"session_id": self._session_id}).collect()
+        self._session.sql(query, params=[self._session_key]).collect()
@@ -1,20 +1,97 @@
 import io
 import logging
+import multiprocessing
 import os
 import re
-from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Iterator, Optional
 
 from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
 from langchain_core.documents.base import Blob
-from pypdf import PdfReader
 from snowflake.snowpark.session import Session
 
 from langchain_snowpoc.documents import SnowBlob, SnowBlobLoader
 
+_MULTISPACE = re.compile(r"[ ]{2,}")
+_ZERO_TRANS = str.maketrans({"\0": " "})
+_BACKENDS = ("pypdf", "pdfium")
+
 logger = logging.getLogger(__name__)
 
 
+def _open_document(stream: IO[bytes], backend: str) -> Any:
+    """Open a pdf with the requested backend, reading from `stream`."""
+    if backend == "pdfium":
+        import pypdfium2 as pdfium
+
+        return pdfium.PdfDocument(stream)
+
+    from pypdf import PdfReader
+
+    return PdfReader(stream)
+
+
+def _seekable(stream: IO[bytes]) -> IO[bytes]:
+    """Both parsers need random access, buffer the stream only when necessary."""
+    return stream if stream.seekable() else io.BytesIO(stream.read())
+
+
+def _num_pages(document: Any, backend: str) -> int:
+    if backend == "pdfium":
+        return len(document)
+    return len(document.pages)
+
+
+def _page_text(document: Any, i: int, backend: str) -> str:
+    """Extract the text of page `i` and squeeze runs of spaces."""
+    if backend == "pdfium":
+        text = document[i].get_textpage().get_text_bounded()
+    else:
+        text = document.pages[i].extract_text(extraction_mode="layout")
+    return _MULTISPACE.sub(" ", text.translate(_ZERO_TRANS))
+
+
+def _check_backend(backend: str) -> str:
+    if backend not in _BACKENDS:
+        raise ValueError(
+            f"Invalid backend {backend!r}. Valid options are: {', '.join(_BACKENDS)}"
+        )
+    return backend
+
+
+_worker_document: Any = None
+_worker_backend: str = "pypdf"
+
+
+def _init_worker(pdf_bytes: bytes, backend: str) -> None:
+    """Open the pdf once per worker process."""
+    global _worker_document, _worker_backend
+    _worker_document = _open_document(io.BytesIO(pdf_bytes), backend)
+    _worker_backend = backend
+
+
+def _worker_page_text(i: int) -> str:
+    return _page_text(_worker_document, i, _worker_backend)
+
+
+def _extract_page_texts(
+    pdf_bytes: bytes, num_pages: int, backend: str, max_workers: Optional[int]
+) -> Iterator[str]:
+    """Yield the cleaned text of every page, extracted by a process pool.
+
+    Workers are spawned rather than forked: the parent holds the Snowpark
+    connection and its threads, which a forked child must not inherit.
+    """
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(pdf_bytes, backend),
+    ) as executor:
+        yield from executor.map(_worker_page_text, range(num_pages))
+
+
 class BaseSnowDocumentLoader(BaseLoader):
     """An example document loader that reads a file line by line."""
 
@@ -31,19 +108,47 @@ class BaseSnowDocumentLoader(BaseLoader):
 
 
 class SnowPDFPageDocumentLoader(BaseSnowDocumentLoader):
+    def __init__(
+        self,
+        blob: Blob,
+        *,
+        max_workers: Optional[int] = 1,
+        backend: str = "pypdf",
+    ) -> None:
+        """Initialize the loader with a file path.
+
+        Args:
+            blob: blob to load
+            max_workers: number of processes extracting pages in parallel,
+                `None` uses all CPUs and 1 extracts pages in this process
+            backend: pdf parser to use, `pypdf` or `pdfium`; `pdfium` requires
+                `pypdfium2` and is considerably faster on large documents
+        """
+        super().__init__(blob)
+        self.max_workers = max_workers
+        self.backend = _check_backend(backend)
+
     def lazy_load(self) -> Iterator[Document]:
         """A lazy loader that returns a pdf file page by page."""
 
         with self.blob.as_bytes_io() as f:
-            reader = PdfReader(io.BytesIO(f.read()))
-
-            for i in range(len(reader.pages)):
-                page = reader.pages[i]
-                text = re.sub(
-                    "([ ]{2,})",
-                    " ",
-                    page.extract_text(extraction_mode="layout").replace("\0", " "),
+            if self.max_workers == 1:
+                document = _open_document(_seekable(f), self.backend)
+                num_pages = _num_pages(document, self.backend)
+                texts = (
+                    _page_text(document, i, self.backend) for i in range(num_pages)
+                )
+            else:
+                pdf_bytes = f.read()
+                num_pages = _num_pages(
+                    _open_document(io.BytesIO(pdf_bytes), self.backend),
+                    self.backend,
                 )
+                texts = _extract_page_texts(
+                    pdf_bytes, num_pages, self.backend, self.max_workers
+                )
+
+            for i, text in enumerate(texts):
                 yield Document(
                     page_content=text,
                     metadata={"page": i, "source": self.blob.metadata},
@@ -51,6 +156,17 @@ class SnowPDFPageDocumentLoader(BaseSnowDocumentLoader):
 
 
 class SnowPDFDocumentLoader(BaseSnowDocumentLoader):
+    def __init__(self, blob: Blob, *, backend: str = "pypdf") -> None:
+        """Initialize the loader with a file path.
+
+        Args:
+            blob: blob to load
+            backend: pdf parser to use, `pypdf` or `pdfium`; `pdfium` requires
+                `pypdfium2` and is considerably faster on large documents
+        """
+        super().__init__(blob)
+        self.backend = _check_backend(backend)
+
     def lazy_load(self) -> Iterator[Document]:
         """A lazy loader that reads a pdf file page by page
         and returns all pages as one Document.
@@ -58,21 +174,18 @@ class SnowPDFDocumentLoader(BaseSnowDocumentLoader):
         """
 
         with self.blob.as_bytes_io() as f:
-            reader = PdfReader(io.BytesIO(f.read()))
-            text = ""
-            for page in reader.pages:
-                text = text + re.sub(
-                    "([ ]{2,})",
-                    " ",
-                    page.extract_text(extraction_mode="layout").replace("\0", " "),
-                )
-            yield Document(
-                page_content=text,
-                metadata={
-                    "number_of_pdf_pages": len(reader.pages),
-                    "source": self.blob.metadata,
-                },
+            document = _open_document(_seekable(f), self.backend)
+            num_pages = _num_pages(document, self.backend)
+            text = "".join(
+                _page_text(document, i, self.backend) for i in range(num_pages)
             )
+        yield Document(
+            page_content=text,
+            metadata={
+                "number_of_pdf_pages": num_pages,
+                "source": self.blob.metadata,
+            },
+        )
 
 
 if __name__ == "__main__":
@@ -1,20 +1,40 @@
 from __future__ import annotations
 
 import logging
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
 
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from snowflake.snowpark.session import Session
-from tqdm.auto import tqdm
 
 from langchain_snowpoc.document_loaders.snowflake_stage_file import (
     SnowflakeStageFileLoader,
 )
+from langchain_snowpoc.documents import _directory_files, _stage_name
 
 logger = logging.getLogger(__name__)
 
 
+def _with_progress(
+    results: Iterator[List[Document]], file_names: List[str]
+) -> Iterator[List[Document]]:
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        logger.warning(
+            "Unable to show progress bar because tqdm could not be imported. "
+            "Please install with `pip install tqdm`."
+        )
+        yield from results
+        return
+
+    pbar = tqdm(results, total=len(file_names), desc="SnowflakeStageDirectoryLoader")
+    for file_docs, file_name in zip(pbar, file_names):
+        pbar.set_postfix_str(file_name, refresh=False)
+        yield file_docs
+
+
 class SnowflakeStageDirectoryLoader(BaseLoader):
     """Load from `Snowflake Stage` directory."""
 
@@ -23,6 +43,9 @@ class SnowflakeStageDirectoryLoader(BaseLoader):
         stage_directory: str,
         *,
         session: Session,
+        max_workers: Optional[int] = 8,
+        use_directory_table: bool = False,
+        show_progress: bool = False,
     ):
         """Initialize with bucket and key name.
 
@@ -31,22 +54,48 @@ class SnowflakeStageDirectoryLoader(BaseLoader):
 
         :param session: Snowflake Session.
 
+        :param max_workers: Number of files downloaded and parsed concurrently.
+
+        :param use_directory_table: List files with the directory table of
+            the stage instead of LIST, falling back to LIST when the stage has
+            none. The directory table has to be refreshed to see new files.
+
+        :param show_progress: Whether to show a tqdm progress bar. Must have
+            `tqdm` installed.
+
         """
         self.stage_directory = stage_directory
         self.session = session
+        self.max_workers = max_workers
+        self.use_directory_table = use_directory_table
+        self.show_progress = show_progress
+
+    def _load_file(self, file_name: str) -> List[Document]:
+        loader = SnowflakeStageFileLoader(
+            staged_file_path=file_name, session=self.session
+        )
+        return loader.load()
 
     def load(self) -> List[Document]:
         """Load documents."""
 
         docs = []
 
-        _stage_objects = self.session.sql(f"LIST {self.stage_directory}").collect()
+        stage = _stage_name(self.stage_directory)
+        files = None
+        if self.use_directory_table and stage.startswith("@"):
+            files = _directory_files(self.session, self.stage_directory)
+        if files is not None:
+            file_names = [f"{stage}/{row.RELATIVE_PATH}" for row in files]
+        else:
+            _stage_objects = self.session.sql(f"LIST {self.stage_directory}").collect()
+            file_names = [f"@{obj.name}" for obj in _stage_objects]
 
-        for obj in (pbar := tqdm(_stage_objects)):
-            file_name = f"@{obj.name}"
-            pbar.set_postfix_str(file_name)
-            loader = SnowflakeStageFileLoader(
-                staged_file_path=file_name, session=self.session
-            )
-            docs.extend(loader.load())
+        # files are fetched and parsed concurrently, map keeps the LIST order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self._load_file, file_names)
+            if self.show_progress:
+                results = _with_progress(results, file_names)
+            for file_docs in results:
+                docs.extend(file_docs)
         return docs
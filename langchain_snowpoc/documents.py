@@ -1,23 +1,80 @@
 from __future__ import annotations
 
 import contextlib
+import email.utils
 import logging
 import mimetypes
 import os
 import re
+from datetime import timezone
 from io import BufferedReader, BytesIO
 from pathlib import PurePath
-from typing import Generator, Iterable, Optional, Union
+from typing import Generator, Iterable, Iterator, Optional, Union
 
-from langchain_community.document_loaders.blob_loaders.schema import Blob, BlobLoader
+from langchain_core.document_loaders import BlobLoader
 from langchain_core.documents.base import Blob
+from pydantic import PrivateAttr
+from snowflake.snowpark import Row
+from snowflake.snowpark.exceptions import SnowparkSQLException
 from snowflake.snowpark.session import Session
 
+from langchain_snowpoc.session import get_session
+
 PathLike = Union[str, PurePath]
 
+_STAGE_RE = re.compile(r"([@~%][\w]+[\w.]+)", re.IGNORECASE)
+
 logger = logging.getLogger(__name__)
 
 
+def _stage_name(url: str) -> str:
+    stage = _STAGE_RE.search(url)
+    if not stage:
+        raise Exception("Did not find correct pattern for stage name")
+    return stage[0]
+
+
+def _directory_files(
+    session: Session, url: str, pattern: str = ".*"
+) -> Optional[Iterator[Row]]:
+    """Stream the files under `url` from the directory table of its stage.
+
+    Like LIST, the path after the stage name is matched as a prefix. Rows
+    have RELATIVE_PATH, SIZE, MD5 and LAST_MODIFIED columns and are fetched
+    lazily, so callers can start working before the whole listing is read.
+    The directory table must be refreshed to see new files. Returns None,
+    so that callers fall back to LIST, when the stage has no directory table.
+    """
+    stage = _stage_name(url)
+    prefix = url[url.index(stage) + len(stage) :].lstrip("/")
+    try:
+        return session.sql(
+            "SELECT RELATIVE_PATH, SIZE, MD5, LAST_MODIFIED"
+            f" FROM DIRECTORY({stage})"
+            " WHERE STARTSWITH(RELATIVE_PATH, ?) AND RELATIVE_PATH RLIKE ?",
+            params=[prefix, pattern],
+        ).to_local_iterator()
+    except SnowparkSQLException as ex:
+        logger.warning(
+            "Unable to read the directory table of %s, falling back to LIST: %s",
+            stage,
+            ex,
+        )
+        return None
+
+
+def _list_metadata(stage: str, row: Row) -> dict:
+    """Describe a directory table row the way LIST does."""
+    return {
+        "name": stage.lstrip("@").split(".")[-1].lower() + "/" + row.RELATIVE_PATH,
+        "size": row.SIZE,
+        "md5": row.MD5,
+        "last_modified": email.utils.format_datetime(
+            row.LAST_MODIFIED.astimezone(timezone.utc), usegmt=True
+        ),
+    }
+
+
 class SnowBlob(Blob):
     """Blob represents raw data by either reference or value.
 
@@ -88,27 +145,37 @@ class SnowBlob(Blob):
     session: Union[Session, None]
     """Snowflake session to use"""
 
+    _cached_bytes: Optional[bytes] = PrivateAttr(default=None)
+
+    def _fetch_bytes(self) -> bytes:
+        """Download the staged file once and keep its content."""
+        if self._cached_bytes is None:
+            with self.session.file.get_stream(self.path, decompress=False) as f:
+                self._cached_bytes = f.read()
+        return self._cached_bytes
+
+    def evict(self) -> None:
+        """Drop the content downloaded from the stage, if any."""
+        self._cached_bytes = None
+
     def as_string(self) -> str:
         """Read data as a string."""
-        if self.data is None and self.path and self.session:
-            with self.session.file.get_stream(self.path, decompress=False) as f:
-                return f.read().decode(self.encoding)
-        elif isinstance(self.data, bytes):
-            return self.data.decode(self.encoding)
-        elif isinstance(self.data, str):
+        if isinstance(self.data, str):
             return self.data
-        else:
-            raise ValueError(f"Unable to get string for blob {self}")
+        return self.as_bytes().decode(self.encoding)
 
     def as_bytes(self) -> bytes:
-        """Read data as bytes."""
+        """Read data as bytes.
+
+        Content of a staged file is downloaded on first access only, use
+        `evict` to release it.
+        """
         if isinstance(self.data, bytes):
             return self.data
         elif isinstance(self.data, str):
             return self.data.encode(self.encoding)
         elif self.data is None and self.path and self.session:
-            with self.session.file.get_stream(self.path, decompress=False) as f:
-                return f.read()
+            return self._fetch_bytes()
         else:
             raise ValueError(f"Unable to get bytes for blob {self}")
 
@@ -118,8 +185,7 @@ class SnowBlob(Blob):
         if isinstance(self.data, bytes):
             yield BytesIO(self.data)
         elif self.data is None and self.path and self.session:
-            with self.session.file.get_stream(self.path, decompress=False) as f:
-                yield f
+            yield BytesIO(self._fetch_bytes())
         else:
             raise NotImplementedError(f"Unable to convert blob {self}")
 
@@ -202,12 +268,30 @@ class SnowBlobLoader(BlobLoader):
         *,
         pattern: str = ".*",
         session: Session = None,
+        connection_name: Optional[str] = None,
+        use_directory_table: bool = False,
     ) -> None:
+        """Initialize the loader.
+
+        Args:
+            url: stage name, optionally followed by a path
+            pattern: regular expression the file paths have to match
+            session: Snowflake session to use
+            connection_name: name of a connection to get a shared session for,
+                used when `session` is not provided
+            use_directory_table: list files with the directory table of a
+                named stage instead of LIST, falling back to LIST when the
+                stage has none; the directory table has to be refreshed to
+                see new files
+        """
+        if session is None and connection_name is not None:
+            session = get_session(connection_name)
 
         self.pattern = pattern
         self.url = url
         self.session = session
         self.stage = self.url
+        self.use_directory_table = use_directory_table and self.stage.startswith("@")
 
     @property
     def stage(self):
@@ -215,10 +299,7 @@ class SnowBlobLoader(BlobLoader):
 
     @stage.setter
     def stage(self, value):
-        stage = re.search(r"([@~%][\w]+[\w.]+)", value, flags=re.IGNORECASE)
-        if not stage:
-            raise Exception("Did not find correct pattern for stage name")
-        self._stage = stage[0]
+        self._stage = _stage_name(value)
 
     @stage.deleter
     def stage(self):
@@ -232,6 +313,17 @@ class SnowBlobLoader(BlobLoader):
     ) -> Iterable[Blob]:
         """Yield blobs that match the requested pattern."""
 
+        if self.use_directory_table:
+            files = _directory_files(self.session, self.url, self.pattern)
+            if files is not None:
+                for f in files:
+                    yield SnowBlob.from_path(
+                        self.stage + "/" + f.RELATIVE_PATH,
+                        metadata=_list_metadata(self.stage, f),
+                        session=self.session,
+                    )
+                return
+
         for f in iter(self._get_files()):
             # Row(name='tst/README.md', size=1888, md5='4e26b7ea3bff13ad9306e5d0e8cfd903', last_modified='Fri, 23 Aug 2024 20:33:38 GMT')
             full_file_path = (
@@ -275,7 +367,8 @@ class SnowBlobDeltaLoader(BlobLoader):
             " METADATA$ISUPDATE as METADATA_ISUPDATE,"
             " METADATA$ROW_ID as METADATA_ROW_ID,"
             f" FROM {self.table_name}"
-            f" WHERE RELATIVE_PATH LIKE '%{self.pattern}%'"
+            " WHERE RELATIVE_PATH LIKE ?",
+            params=[f"%{self.pattern}%"],
         ).collect()
 
     def yield_blobs(
@@ -61,9 +61,9 @@ class SnowflakeEmbeddings(BaseModel, Embeddings):
         Returns:
             The response as a dictionary.
         """
-        q = f"SELECT SNOWFLAKE.CORTEX.EMBED_TEXT_768('{self.model}', $${input}$$) as EMBEDDING"
+        q = f"SELECT SNOWFLAKE.CORTEX.EMBED_TEXT_768('{self.model}', ?) as EMBEDDING"
 
-        return self.session.sql(q).collect()[0].EMBEDDING
+        return self.session.sql(q, params=[input]).collect()[0].EMBEDDING
 
     def _embed(self, input: List[str]) -> List[List[float]]:
         if self.show_progress:
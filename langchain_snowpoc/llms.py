@@ -1,10 +1,19 @@
+import asyncio
+import hashlib
 import logging
-from typing import Any, List, Mapping, Optional
+from typing import Any, List, Mapping, Optional, Tuple
 
-from langchain_core.callbacks.manager import CallbackManagerForLLMRun
+from langchain_core.callbacks.manager import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
 from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import Generation, LLMResult
+from pydantic import PrivateAttr
 from snowflake.snowpark.session import Session
 
+from langchain_snowpoc.cache import LRUCache, SemanticCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,10 +22,99 @@ class SQLCortex(LLM):
 
     model: str = "llama3.1-405b"
 
+    prompt_cache_size: int = 0
+    """Number of completions kept in the exact-match cache, disabled by default.
+
+    A cached prompt returns its first completion instead of sampling again.
+    Pass ``no_cache=True`` to `invoke`/`generate` to bypass the caches for one
+    call. LangChain's own ``cache=`` / ``set_llm_cache`` works as well."""
+
+    semantic_cache_threshold: Optional[float] = None
+    """Cosine similarity above which the completion of a near-duplicate prompt
+    is reused. Requires `numpy` and a `prompt_cache_size` above 0, the
+    semantic cache is disabled when None."""
+
+    semantic_cache_model: str = "e5-base-v2"
+    """Embedding model used by the semantic cache."""
+
+    _prompt_cache: LRUCache = PrivateAttr()
+    _semantic_cache: Optional[SemanticCache] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._prompt_cache = LRUCache(maxsize=self.prompt_cache_size)
+        if self.semantic_cache_threshold is not None and self.prompt_cache_size <= 0:
+            logger.warning(
+                "Ignoring semantic_cache_threshold because prompt_cache_size is "
+                "0. Set prompt_cache_size to enable the semantic cache."
+            )
+        elif self.semantic_cache_threshold is not None:
+            try:
+                self._semantic_cache = SemanticCache(
+                    threshold=self.semantic_cache_threshold,
+                    maxsize=self.prompt_cache_size,
+                )
+            except ImportError:
+                logger.warning(
+                    "Unable to use the semantic cache because numpy could not be "
+                    "imported. Please install with `pip install numpy`."
+                )
+
     @property
     def _llm_type(self) -> str:
         return "sqlcortex"
 
+    def _cache_key(self, prompt: str) -> bytes:
+        return hashlib.blake2b((self.model + "\0" + prompt).encode("utf-8")).digest()
+
+    def _embed(self, prompt: str) -> List[float]:
+        q = f"SELECT SNOWFLAKE.CORTEX.EMBED_TEXT_768('{self.semantic_cache_model}', ?) as EMBEDDING"
+        return self.session.sql(q, params=[prompt]).collect()[0].EMBEDDING
+
+    def _lookup(self, prompt: str) -> Tuple[Optional[str], Optional[List[float]]]:
+        """Return a cached completion, and the prompt embedding if one was computed."""
+        key = self._cache_key(prompt)
+        cached = self._prompt_cache.get(key)
+        if cached is not None or self._semantic_cache is None:
+            return cached, None
+        embedding = self._embed(prompt)
+        cached = self._semantic_cache.get(embedding)
+        if cached is not None:
+            self._prompt_cache.set(key, cached)
+        return cached, embedding
+
+    def _store(
+        self, prompt: str, completion: str, embedding: Optional[List[float]]
+    ) -> None:
+        self._prompt_cache.set(self._cache_key(prompt), completion)
+        if embedding is not None:
+            self._semantic_cache.set(embedding, completion)
+
+    def _complete(self, prompts: List[str]) -> List[str]:
+        """Run all prompts through Cortex in a single query, keeping their order."""
+        values = ", ".join(["(?, ?)"] * len(prompts))
+        q = f"""SELECT SNOWFLAKE.CORTEX.COMPLETE('{self.model}', column2) as COMPLETION
+            FROM VALUES {values}
+            ORDER BY column1"""
+        params = [value for i, prompt in enumerate(prompts) for value in (i, prompt)]
+        return [row.COMPLETION for row in self.session.sql(q, params=params).collect()]
+
+    def _completions(self, prompts: List[str], use_cache: bool) -> List[str]:
+        results: List[Optional[str]] = [None] * len(prompts)
+        embeddings: List[Optional[List[float]]] = [None] * len(prompts)
+        if use_cache:
+            for i, prompt in enumerate(prompts):
+                results[i], embeddings[i] = self._lookup(prompt)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            completions = self._complete([prompts[i] for i in missing])
+            for i, completion in zip(missing, completions):
+                results[i] = completion
+                if use_cache:
+                    self._store(prompts[i], completion, embeddings[i])
+        return results
+
     def _call(
         self,
         prompt: str,
@@ -26,9 +124,46 @@ class SQLCortex(LLM):
     ) -> str:
         if stop is not None:
             raise ValueError("stop kwargs are not permitted.")
-        q = f"""SELECT SNOWFLAKE.CORTEX.COMPLETE('{self.model}', $$%(prompt)s$$) as COMPLETION"""
-        res = self.session.sql(q % {"prompt": prompt}).collect()[0].COMPLETION
-        return res
+        use_cache = not kwargs.pop("no_cache", False)
+        return self._completions([prompt], use_cache)[0]
+
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Run the prompts through Cortex, unless cached completions exist.
+
+        All prompts missing from the caches are completed by a single query.
+        Pass ``no_cache=True`` to bypass the caches.
+        """
+        if stop is not None:
+            raise ValueError("stop kwargs are not permitted.")
+        use_cache = not kwargs.pop("no_cache", False)
+        completions = self._completions(prompts, use_cache)
+        return LLMResult(generations=[[Generation(text=text)] for text in completions])
+
+    async def _agenerate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        """Run `_generate` in a worker thread, so the event loop is not blocked.
+
+        Unlike the default implementation, all prompts are still completed by
+        a single query instead of one awaited `_acall` per prompt.
+        """
+        return await asyncio.to_thread(
+            self._generate,
+            prompts,
+            stop,
+            run_manager.get_sync() if run_manager else None,
+            **kwargs,
+        )
 
     @property
     def _identifying_params(self) -> Mapping[str, Any]:
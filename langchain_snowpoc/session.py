@@ -0,0 +1,52 @@
+"""Shared Snowpark sessions keyed by connection name."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict
+
+from snowflake.snowpark.session import Session
+
+logger = logging.getLogger(__name__)
+
+_sessions: Dict[str, Session] = {}
+_lock = threading.Lock()
+
+
+def _is_connection_alive(session: Session) -> bool:
+    """Check, without a round-trip, that the session's connection is open."""
+    try:
+        return not session.connection.is_closed()
+    except Exception:
+        return False
+
+
+def get_session(connection_name: str) -> Session:
+    """Return a Snowpark session for a named connection, creating it once.
+
+    Sessions are memoized per connection name for the lifetime of the process,
+    so authentication (including SSO round-trips) happens only on first use.
+    They are created with ``client_session_keep_alive`` so that idle sessions
+    are not expired by the server, and a closed session is replaced
+    transparently.
+
+    Args:
+        connection_name: Name of a connection from ``connections.toml``.
+
+    Returns:
+        Session instance
+    """
+    with _lock:
+        session = _sessions.get(connection_name)
+        if session is None or not _is_connection_alive(session):
+            logger.info("Creating Snowflake session for %s", connection_name)
+            session = Session.builder.configs(
+                {
+                    "connection_name": connection_name,
+                    "client_session_keep_alive": True,
+                }
+            ).create()
+            session.telemetry_enabled = False
+            _sessions[connection_name] = session
+        return session
@@ -1,22 +1,181 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
 import logging
+import math
+import os
+import uuid
 import warnings
-from typing import Any, Iterable, List, Optional, Tuple, Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
+from snowflake.snowpark.exceptions import SnowparkSQLException
 from snowflake.snowpark.session import Session
 
+from langchain_snowpoc import _json
+from langchain_snowpoc.cache import LRUCache, SemanticCache
+
 VECTOR_LENGTH = 768
+STAGING_THRESHOLD = 1000
+EMBEDDING_CACHE_SIZE = 1024
+HASH_PARALLEL_THRESHOLD = 1024
+HASH_PARALLEL_MIN_LENGTH = 2048
+EMBED_BATCH_SIZE = 96
+EMBED_MAX_WORKERS = 8
 logger = logging.getLogger(__name__)
 
+# rowhash, text, metadata (JSON), text_embedding (JSON), embed_inv_norm
+_Row = Tuple[str, str, str, str, Optional[float]]
+
+
+def _sha256(texts: List[str]) -> List[str]:
+    return [hashlib.sha256(text.encode("UTF-8")).hexdigest() for text in texts]
+
+
+def _hash_texts(texts: List[str]) -> List[str]:
+    """Return the SHA-256 hex digest of each text, as stored in rowhash.
+
+    OpenSSL only releases the GIL while hashing buffers over 2 KiB, so a
+    thread pool is used for large batches of texts that long on average.
+    Shorter texts are hashed in one loop, where a pool would only add
+    contention.
+    """
+    workers = os.cpu_count() or 1
+    if workers == 1 or len(texts) < HASH_PARALLEL_THRESHOLD:
+        return _sha256(texts)
+    # character counts are a lower bound on the encoded size
+    if sum(map(len, texts)) < HASH_PARALLEL_MIN_LENGTH * len(texts):
+        return _sha256(texts)
+    size = -(-len(texts) // workers)
+    slices = [texts[i : i + size] for i in range(0, len(texts), size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [_hash for hashes in executor.map(_sha256, slices) for _hash in hashes]
+
+
+def _inv_norm(embedding: List[float]) -> Optional[float]:
+    """Return 1 / ||embedding||, or None for a zero vector."""
+    norm = math.sqrt(math.fsum(x * x for x in embedding))
+    return 1.0 / norm if norm else None
+
+
+def _document_with_score(row: Any) -> Tuple[Document, float]:
+    metadata = _json.loads(row["METADATA"]) if row["METADATA"] else {}
+    return Document(page_content=row["TEXT"], metadata=metadata), row["SIMILARITY"]
+
+
+class _CachedEmbeddings(Embeddings):
+    """Keep the embeddings of recent texts in memory, keyed by model and hash.
+
+    Document and query embeddings are cached apart, as some models embed a
+    query differently from a document with the same text.
+
+    Texts missing from the cache are embedded in batches of `batch_size`,
+    up to `max_workers` batches at a time.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        maxsize: int,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_workers: int = EMBED_MAX_WORKERS,
+    ) -> None:
+        self.embedding = embedding
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._model_id = getattr(embedding, "model", type(embedding).__name__)
+        self._cache: LRUCache[List[float]] = LRUCache(maxsize=maxsize)
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        size = max(self.batch_size, 1)
+        return [texts[i : i + size] for i in range(0, len(texts), size)]
+
+    def _embed_batches(self, texts: List[str]) -> List[List[float]]:
+        batches = self._batches(texts)
+        if len(batches) <= 1 or self.max_workers == 1:
+            results = map(self.embedding.embed_documents, batches)
+            return [e for batch in results for e in batch]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self.embedding.embed_documents, batches)
+            return [e for batch in results for e in batch]
+
+    async def _aembed_batches(self, texts: List[str]) -> List[List[float]]:
+        semaphore = asyncio.Semaphore(max(self.max_workers, 1))
+
+        async def _embed(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embedding.aembed_documents(batch)
+
+        results = await asyncio.gather(*(_embed(b) for b in self._batches(texts)))
+        return [e for batch in results for e in batch]
+
+    def _lookup(
+        self, texts: List[str], hashes: Optional[List[str]] = None
+    ) -> Tuple[List[Any], List[Any], List[int]]:
+        if hashes is None:
+            hashes = _hash_texts(texts)
+        keys = [(self._model_id, "doc", _hash) for _hash in hashes]
+        embeds = [self._cache.get(key) for key in keys]
+        missing = [i for i, embed in enumerate(embeds) if embed is None]
+        return keys, embeds, missing
+
+    def _fill(
+        self,
+        keys: List[Any],
+        embeds: List[Any],
+        missing: List[int],
+        computed: List[List[float]],
+    ) -> List[List[float]]:
+        for i, embed in zip(missing, computed):
+            embeds[i] = embed
+            self._cache.set(keys[i], embed)
+        return embeds
+
+    def embed_documents(
+        self, texts: List[str], hashes: Optional[List[str]] = None
+    ) -> List[List[float]]:
+        """Embed `texts`, given their `hashes` when already computed."""
+        keys, embeds, missing = self._lookup(texts, hashes)
+        computed = self._embed_batches([texts[i] for i in missing])
+        return self._fill(keys, embeds, missing, computed)
+
+    async def aembed_documents(
+        self, texts: List[str], hashes: Optional[List[str]] = None
+    ) -> List[List[float]]:
+        """Embed `texts`, given their `hashes` when already computed."""
+        keys, embeds, missing = self._lookup(texts, hashes)
+        computed = await self._aembed_batches([texts[i] for i in missing])
+        return self._fill(keys, embeds, missing, computed)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = (self._model_id, "query", _sha256([text])[0])
+        embed = self._cache.get(key)
+        if embed is None:
+            embed = self.embedding.embed_query(text)
+            self._cache.set(key, embed)
+        return embed
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = (self._model_id, "query", _sha256([text])[0])
+        embed = self._cache.get(key)
+        if embed is None:
+            embed = await self.embedding.aembed_query(text)
+            self._cache.set(key, embed)
+        return embed
+
 
 class SnowflakeVectorStore(VectorStore):
-    """Wrapper around Snowflake vector data type used as vector store."""
+    """Wrapper around Snowflake vector data type used as vector store.
+
+    Query embeddings are cached in memory, shared by the sync and async
+    search methods, with and without scores: calling `similarity_search` and
+    then `similarity_search_with_score` for the same query embeds it once.
+    Search results can be cached as well, see `result_cache_size`.
+    """
 
     def __init__(
         self,
@@ -24,15 +183,62 @@ class SnowflakeVectorStore(VectorStore):
         session: Session,
         embedding: Embeddings,
         vector_length: int = VECTOR_LENGTH,
+        embedding_cache_size: int = EMBEDDING_CACHE_SIZE,
+        result_cache_size: int = 0,
+        semantic_cache_threshold: Optional[float] = None,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
+        embed_max_workers: int = EMBED_MAX_WORKERS,
     ):
+        """Initialize the vector store, creating its table if needed.
+
+        Args:
+            table: Name of the table holding texts and embeddings.
+            session: Snowflake session.
+            embedding: Embeddings used for texts and queries.
+            vector_length: Dimension of the embeddings.
+            embedding_cache_size: Number of recent embeddings kept in memory,
+                so repeated queries skip the embedding model; 0 disables it.
+            result_cache_size: Number of search results kept in memory for
+                repeated queries, disabled by default. The cache is cleared
+                by `add_texts` and `clear_cache` of this instance only: enable
+                it when no other process writes to the table, or call
+                `clear_cache` after such writes.
+            semantic_cache_threshold: Cosine similarity above which the
+                results of a near-duplicate query are reused. Requires
+                `numpy` and a `result_cache_size` above 0, the semantic
+                cache is disabled when None.
+            embed_batch_size: Number of texts sent to `embed_documents` at
+                once, keep it within the provider's limit.
+            embed_max_workers: Number of batches embedded concurrently; use
+                1 with a larger batch size for local models.
+        """
 
         if not isinstance(embedding, Embeddings):
             warnings.warn("embeddings input must be Embeddings object.")
 
         self._session = session
         self._table = table
-        self._embedding = embedding
+        self._embedding = _CachedEmbeddings(
+            embedding,
+            embedding_cache_size,
+            batch_size=embed_batch_size,
+            max_workers=embed_max_workers,
+        )
         self._vector_length = vector_length
+        self._result_cache: LRUCache[List[Tuple[Document, float]]] = LRUCache(
+            maxsize=result_cache_size
+        )
+        self._semantic_cache: Optional[SemanticCache] = None
+        if semantic_cache_threshold is not None:
+            try:
+                self._semantic_cache = SemanticCache(
+                    threshold=semantic_cache_threshold, maxsize=result_cache_size
+                )
+            except ImportError:
+                logger.warning(
+                    "Unable to use the semantic cache because numpy could not be "
+                    "imported. Please install with `pip install numpy`."
+                )
 
         self.create_table_if_not_exists()
 
@@ -44,7 +250,8 @@ class SnowflakeVectorStore(VectorStore):
               rowhash VARCHAR,
               text VARCHAR,
               metadata VARIANT,
-              text_embedding vector(float, {self._vector_length})
+              text_embedding vector(float, {self._vector_length}),
+              embed_inv_norm FLOAT
             )
             ;
             """
@@ -53,6 +260,32 @@ class SnowflakeVectorStore(VectorStore):
         except Exception as ex:
             print(f"{_q}\n{ex}")
             raise ex
+        self._has_inv_norm = self._ensure_inv_norm_column()
+
+    def _ensure_inv_norm_column(self) -> bool:
+        """Add the embed_inv_norm column to tables created by earlier versions.
+
+        The column is looked up with SHOW COLUMNS, which needs no warehouse,
+        and only added when missing. Returns whether the column exists: roles
+        that may not alter the table keep using the full cosine.
+        """
+        _show = f"SHOW COLUMNS LIKE 'EMBED_INV_NORM' IN TABLE {self._table}"
+        if self._session.sql(_show).collect():
+            return True
+        try:
+            self._session.sql(
+                f"ALTER TABLE {self._table} "
+                "ADD COLUMN IF NOT EXISTS embed_inv_norm FLOAT"
+            ).collect()
+        except SnowparkSQLException as ex:
+            logger.warning(
+                "Unable to add embed_inv_norm to %s, searching with the full "
+                "cosine instead: %s",
+                self._table,
+                ex,
+            )
+            return False
+        return True
 
     def add_texts(
         self,
@@ -62,84 +295,374 @@ class SnowflakeVectorStore(VectorStore):
     ) -> List[str]:
         """Add more texts to the vectorstore index.
 
+        Args:
+            texts: Iterable of strings to add to the vectorstore.
+            metadatas: Optional list of metadatas associated with the texts,
+                stored as JSON; keys that are not strings become strings, as
+                with `json.dumps`.
+            kwargs: vectorstore specific parameters
+        """
+        return list(self.add_texts_iter(texts, metadatas, **kwargs))
+
+    def add_texts_iter(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> Iterator[int]:
+        """Add more texts to the vectorstore index, streaming back their rowids.
+
+        The texts are written before this returns; only the rowids, one per
+        input text, are fetched lazily while the iterator is consumed.
+
         Args:
             texts: Iterable of strings to add to the vectorstore.
             metadatas: Optional list of metadatas associated with the texts.
             kwargs: vectorstore specific parameters
         """
-        max_id = (
-            self._session.sql(f"SELECT NVL(max(rowid), 0) as rowid FROM {self._table}")
-            .collect()[0]
-            .ROWID
+        hashes, unique = self._dedup(texts, metadatas)
+        unique = self._unstored(unique)
+        embeds = self._embedding.embed_documents(
+            [text for text, _ in unique.values()], list(unique)
         )
-        embeds = self._embedding.embed_documents(list(texts))
-        if not metadatas:
-            metadatas = [{} for _ in texts]
+        self._write(unique, embeds)
+        return self._iter_added_rowids(hashes)
 
-        data_input = [
-            (text, json.dumps(metadata), embed)
-            for text, metadata, embed in zip(texts, metadatas, embeds)
+    async def aadd_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        """Add more texts to the vectorstore index, without blocking the loop.
+
+        Texts are embedded with the async API of the embeddings, the writes
+        to Snowflake run in a worker thread.
+        """
+        hashes, unique = self._dedup(texts, metadatas)
+        unique = await asyncio.to_thread(self._unstored, unique)
+        embeds = await self._embedding.aembed_documents(
+            [text for text, _ in unique.values()], list(unique)
+        )
+        await asyncio.to_thread(self._write, unique, embeds)
+        return await asyncio.to_thread(list, self._iter_added_rowids(hashes))
+
+    def _dedup(
+        self, texts: Iterable[str], metadatas: Optional[List[dict]]
+    ) -> Tuple[List[str], Dict[str, Tuple[str, dict]]]:
+        """Hash `texts`, keeping the first text and metadata of every hash."""
+        # `texts` may be a generator, it must be consumed only once
+        texts = list(texts)
+        # only serialized, so the texts can share one empty dict
+        metadatas = metadatas or [{}] * len(texts)
+
+        # hash first, so that duplicated texts are embedded and merged once
+        hashes = []
+        unique = {}
+        for _hash, text, metadata in zip(_hash_texts(texts), texts, metadatas):
+            hashes.append(_hash)
+            unique.setdefault(_hash, (text, metadata))
+        return hashes, unique
+
+    def _unstored(
+        self, unique: Dict[str, Tuple[str, dict]]
+    ) -> Dict[str, Tuple[str, dict]]:
+        """Drop the texts whose hash is already in the table.
+
+        One lookup spares embedding texts that MERGE would skip anyway, which
+        makes re-ingesting unchanged documents nearly free.
+        """
+        if not unique:
+            return unique
+        q = f"""
+            SELECT t.rowhash
+            FROM {self._table} t
+            JOIN TABLE(FLATTEN(INPUT => PARSE_JSON(?))) f
+                ON t.rowhash = f.value::VARCHAR
+        """
+        results = self._session.sql(q, params=[_json.dumps(list(unique))])
+        stored = {row["ROWHASH"] for row in results.to_local_iterator()}
+        return {h: item for h, item in unique.items() if h not in stored}
+
+    def _write(
+        self, unique: Dict[str, Tuple[str, dict]], embeds: List[List[float]]
+    ) -> None:
+        """Merge the unique texts with their embeddings."""
+        rows = [
+            (_hash, text, _json.dumps(metadata), _json.dumps(embed), _inv_norm(embed))
+            for (_hash, (text, metadata)), embed in zip(unique.items(), embeds)
         ]
-        # https://docs.snowflake.com/LIMITEDACCESS/vector-search#snowflake-python-connector
-        for row in data_input:
-            _hash = hashlib.sha256(row[0].encode("UTF-8")).hexdigest()
-            _text = row[0].replace("'", "\\'")
-            _metadata = row[1]
-            _vec = row[2]
-            _q = f"""
-                MERGE INTO {self._table} t USING (
-                    SELECT
-                        '{_hash}'::VARCHAR as rowhash,
-                        '{_text}'::VARCHAR as text,
-                        PARSE_JSON('{_metadata}') as metadata,
-                        {_vec}::VECTOR(float, {self._vector_length}) as text_embedding
-                    ) s
-                ON s.rowhash = t.rowhash
-                WHEN NOT MATCHED THEN
-                    INSERT (rowhash, text, metadata, text_embedding)
-                    VALUES (s.rowhash, s.text, s.metadata, s.text_embedding);
-            """
-            self._session.sql(_q).collect()
 
-        # pulling every ids we just inserted
-        results = self._session.sql(
-            f"SELECT rowid FROM {self._table} WHERE rowid > {max_id}"
-        ).collect()
-        return [row["ROWID"] for row in results]
+        if len(rows) > STAGING_THRESHOLD:
+            self._merge_staged(rows)
+        elif rows:
+            self._merge_values(rows)
+        self.clear_cache()
+
+    def _iter_added_rowids(self, hashes: List[str]) -> Iterator[int]:
+        """Look up the rowid of each hash, in the order of `hashes`.
+
+        The hashes are bound as a single JSON array, so the lookup is one
+        join on rowhash rather than a scan for rows added since a given id.
+        """
+        if not hashes:
+            return
+        q = f"""
+            SELECT t.rowid
+            FROM {self._table} t
+            JOIN TABLE(FLATTEN(INPUT => PARSE_JSON(?))) f
+                ON t.rowhash = f.value::VARCHAR
+            ORDER BY f.index
+        """
+        # one row per input text, stream them rather than collecting at once
+        results = self._session.sql(q, params=[_json.dumps(hashes)]).to_local_iterator()
+        for row in results:
+            yield row["ROWID"]
+
+    def _merge_query(self, source: str) -> str:
+        """Make a MERGE inserting the rows of `source` whose hash is not stored.
+
+        `source` has rowhash, text, metadata, text_embedding and embed_inv_norm
+        columns, metadata and text_embedding holding JSON text. The norm is
+        dropped when the table has no embed_inv_norm column.
+        """
+        columns = "rowhash, text, metadata, text_embedding"
+        values = "s.rowhash, s.text, s.metadata, s.text_embedding"
+        if self._has_inv_norm:
+            columns += ", embed_inv_norm"
+            values += ", s.embed_inv_norm"
+        return f"""
+            MERGE INTO {self._table} t USING (
+                SELECT
+                    rowhash::VARCHAR as rowhash,
+                    text::VARCHAR as text,
+                    PARSE_JSON(metadata) as metadata,
+                    PARSE_JSON(text_embedding)::ARRAY
+                        ::VECTOR(float, {self._vector_length}) as text_embedding,
+                    embed_inv_norm::FLOAT as embed_inv_norm
+                FROM {source}
+                ) s
+            ON s.rowhash = t.rowhash
+            WHEN NOT MATCHED THEN
+                INSERT ({columns})
+                VALUES ({values});
+        """
+
+    def _merge_values(self, rows: List[_Row]) -> None:
+        """Merge `rows` using a VALUES list of bind parameters as source.
+
+        The statement text only depends on the number of rows, so Snowflake
+        can reuse its compiled plan, and texts need no escaping.
+        """
+        values = ", ".join(["(?, ?, ?, ?, ?)"] * len(rows))
+        source = (
+            f"VALUES {values} "
+            "AS v(rowhash, text, metadata, text_embedding, embed_inv_norm)"
+        )
+        params = [value for row in rows for value in row]
+        self._session.sql(self._merge_query(source), params=params).collect()
+
+    def _merge_staged(self, rows: List[_Row]) -> None:
+        """Merge `rows` through a temporary staging table."""
+        staging_table = f"{self._table}__stg_{uuid.uuid4().hex}"
+        self._session.create_dataframe(
+            rows,
+            schema=["ROWHASH", "TEXT", "METADATA", "TEXT_EMBEDDING", "EMBED_INV_NORM"],
+        ).write.mode("overwrite").save_as_table(
+            staging_table, table_type="temporary"
+        )
+        try:
+            self._session.sql(self._merge_query(staging_table)).collect()
+        finally:
+            self._session.sql(f"DROP TABLE IF EXISTS {staging_table}").collect()
+
+    def _similarity_sql(self) -> str:
+        """Cosine similarity of `e.text_embedding` and `s.search_embedding`."""
+        cosine = "VECTOR_COSINE_SIMILARITY(e.text_embedding, s.search_embedding)"
+        if not self._has_inv_norm:
+            return cosine
+        return f"""COALESCE(
+                    VECTOR_INNER_PRODUCT(e.text_embedding, s.search_embedding)
+                        * e.embed_inv_norm * s.search_inv_norm,
+                    {cosine}
+                )"""
 
     def similarity_search_with_score_by_vector(
         self, embedding: List[float], k: int = 4, **kwargs: Any
     ) -> List[Tuple[Document, float]]:
+        """Return the `k` docs most similar to `embedding`, with their score.
+
+        Snowflake has no approximate vector index, so this is an exact scan
+        of every stored embedding. The inverse norms of stored embeddings are
+        precomputed, which turns the cosine into a scaled inner product; rows
+        written before that column existed, or tables the role could not add
+        it to, fall back to the full cosine.
+        """
         sql_query = f"""
             WITH search_t as (
-                SELECT {embedding}::VECTOR(float, {self._vector_length}) as search_embedding
+                SELECT
+                    PARSE_JSON(?)::ARRAY::VECTOR(float, {self._vector_length})
+                        as search_embedding,
+                    ?::FLOAT as search_inv_norm
             )
             SELECT
                 text,
                 metadata,
-                VECTOR_COSINE_SIMILARITY(e.text_embedding, s.search_embedding) AS similarity
+                {self._similarity_sql()} AS similarity
             FROM {self._table} e, search_t s
             ORDER BY similarity DESC
-            LIMIT {k}
+            LIMIT ?
         """
-        results = self._session.sql(sql_query).collect()
+        # binding the vector keeps the statement text, and its plan, reusable
+        results = self._session.sql(
+            sql_query, params=[_json.dumps(embedding), _inv_norm(embedding), k]
+        ).collect()
 
-        documents = []
-        for row in results:
-            metadata = json.loads(row["METADATA"]) or {}
-            doc = Document(page_content=row["TEXT"], metadata=metadata)
-            documents.append((doc, row["SIMILARITY"]))
+        return [_document_with_score(row) for row in results]
+
+    def similarity_search_with_score_by_vectors(
+        self, embeddings: List[List[float]], k: int = 4, **kwargs: Any
+    ) -> List[List[Tuple[Document, float]]]:
+        """Return the `k` docs most similar to each embedding, with their score.
+
+        All embeddings are searched by one query, so the table is scanned once
+        for the whole batch instead of once per embedding.
+        """
+        if not embeddings:
+            return []
+        values = ", ".join(["(?, ?, ?)"] * len(embeddings))
+        sql_query = f"""
+            WITH search_t as (
+                SELECT
+                    column1 as qid,
+                    PARSE_JSON(column2)::ARRAY::VECTOR(float, {self._vector_length})
+                        as search_embedding,
+                    column3::FLOAT as search_inv_norm
+                FROM VALUES {values}
+            )
+            SELECT
+                s.qid,
+                text,
+                metadata,
+                {self._similarity_sql()} AS similarity
+            FROM {self._table} e, search_t s
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY s.qid ORDER BY similarity DESC) <= ?
+            ORDER BY s.qid, similarity DESC
+        """
+        params = [
+            value
+            for i, embedding in enumerate(embeddings)
+            for value in (i, _json.dumps(embedding), _inv_norm(embedding))
+        ]
+        results = self._session.sql(sql_query, params=params + [k]).collect()
 
+        documents: List[List[Tuple[Document, float]]] = [[] for _ in embeddings]
+        for row in results:
+            documents[row["QID"]].append(_document_with_score(row))
         return documents
 
-    def similarity_search(
-        self, query: str, k: int = 4, **kwargs: Any
-    ) -> List[Document]:
-        """Return docs most similar to query."""
+    def similarity_search_batch(
+        self, queries: List[str], k: int = 4, **kwargs: Any
+    ) -> List[List[Document]]:
+        """Return docs most similar to each query, searching all in one query."""
+        # embed_query, as some models embed queries differently from documents
+        embeddings = [self._embedding.embed_query(query) for query in queries]
+        return [
+            [doc for doc, _ in documents]
+            for documents in self.similarity_search_with_score_by_vectors(
+                embeddings, k=k
+            )
+        ]
+
+    async def asimilarity_search_batch(
+        self, queries: List[str], k: int = 4, **kwargs: Any
+    ) -> List[List[Document]]:
+        """Return docs most similar to each query, without blocking the loop.
+
+        Queries are embedded concurrently, then searched by one query run in
+        a worker thread.
+        """
+        embeddings = await asyncio.gather(
+            *(self._embedding.aembed_query(query) for query in queries)
+        )
+        results = await asyncio.to_thread(
+            self.similarity_search_with_score_by_vectors, list(embeddings), k
+        )
+        return [[doc for doc, _ in documents] for documents in results]
+
+    def clear_cache(self) -> None:
+        """Forget cached search results, e.g. after the table was modified."""
+        self._result_cache.clear()
+        if self._semantic_cache is not None:
+            self._semantic_cache.clear()
+
+    def _cached_results(
+        self, query: str, k: int, embedding: Optional[List[float]] = None
+    ) -> Optional[List[Tuple[Document, float]]]:
+        """Return cached results for `query`, or None.
+
+        Results of an identical query are served from the result cache. Given
+        the query embedding, and with the semantic cache, results of a
+        near-duplicate query that fetched at least `k` documents are reused.
+        """
+        key = (query, k)
+        cached = self._result_cache.get(key)
+        if (
+            cached is None
+            and embedding is not None
+            and self._semantic_cache is not None
+        ):
+            hit = self._semantic_cache.get(embedding)
+            if hit is not None and hit[0] >= k:
+                cached = hit[1][:k]
+                self._result_cache.set(key, cached)
+        return None if cached is None else list(cached)
+
+    def _cache_results(
+        self,
+        query: str,
+        k: int,
+        embedding: List[float],
+        documents: List[Tuple[Document, float]],
+    ) -> List[Tuple[Document, float]]:
+        self._result_cache.set((query, k), documents)
+        if self._semantic_cache is not None:
+            self._semantic_cache.set(embedding, (k, documents))
+        return list(documents)
+
+    def _cached_search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        cached = self._cached_results(query, k)
+        if cached is not None:
+            return cached
         embedding = self._embedding.embed_query(query)
+        cached = self._cached_results(query, k, embedding)
+        if cached is not None:
+            return cached
         documents = self.similarity_search_with_score_by_vector(
             embedding=embedding, k=k
         )
+        return self._cache_results(query, k, embedding, documents)
+
+    async def _acached_search(
+        self, query: str, k: int
+    ) -> List[Tuple[Document, float]]:
+        cached = self._cached_results(query, k)
+        if cached is not None:
+            return cached
+        embedding = await self._embedding.aembed_query(query)
+        cached = self._cached_results(query, k, embedding)
+        if cached is not None:
+            return cached
+        documents = await asyncio.to_thread(
+            self.similarity_search_with_score_by_vector, embedding, k
+        )
+        return self._cache_results(query, k, embedding, documents)
+
+    def similarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        """Return docs most similar to query."""
+        documents = self._cached_search(query, k)
         return [doc for doc, _ in documents]
 
     def similarity_search_with_score(
@@ -147,11 +670,20 @@ class SnowflakeVectorStore(VectorStore):
     ) -> List[Tuple[Document, float]]:
         """Return docs most similar to query."""
 
-        embedding = self._embedding.embed_query(query)
-        documents = self.similarity_search_with_score_by_vector(
-            embedding=embedding, k=k
-        )
-        return documents
+        return self._cached_search(query, k)
+
+    async def asimilarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        """Return docs most similar to query, without blocking the loop."""
+        documents = await self._acached_search(query, k)
+        return [doc for doc, _ in documents]
+
+    async def asimilarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """Return docs most similar to query, without blocking the loop."""
+        return await self._acached_search(query, k)
 
     def similarity_search_by_vector(
         self, embedding: List[float], k: int = 4, **kwargs: Any
@@ -169,10 +701,16 @@ class SnowflakeVectorStore(VectorStore):
         metadatas: Optional[List[dict]] = None,
         table: str = "langchain",
         session: Session = None,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
         **kwargs: Any,
     ) -> SnowflakeVectorStore:
         """Return VectorStore initialized from texts and embeddings."""
 
-        vector_store = cls(table=table, session=session, embedding=embedding)
+        vector_store = cls(
+            table=table,
+            session=session,
+            embedding=embedding,
+            embed_batch_size=embed_batch_size,
+        )
         vector_store.add_texts(texts=texts, metadatas=metadatas)
         return vector_store